@@ -15,7 +15,9 @@ def make(
         episode_length=1000,
         environment_kwargs=None,
         time_limit=None,
-        channels_first=True
+        channels_first=True,
+        validate_actions=False,
+        include_internal_state=True
 ):
     env_id = 'dmc_%s_%s_%s-v1' % (domain_name, task_name, seed)
 
@@ -46,6 +48,8 @@ def make(
                 camera_id=camera_id,
                 frame_skip=frame_skip,
                 channels_first=channels_first,
+                validate_actions=validate_actions,
+                include_internal_state=include_internal_state,
             ),
             max_episode_steps=max_episode_steps,
         )
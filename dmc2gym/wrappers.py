@@ -5,35 +5,28 @@ import numpy as np
 
 
 def _spec_to_box(spec):
-    def extract_min_max(s):
+    spec = list(spec)
+    dims = [int(np.prod(s.shape)) for s in spec]
+    total = sum(dims)
+    low = np.empty(total, dtype=np.float32)
+    high = np.empty_like(low)
+
+    offset = 0
+    for s, dim in zip(spec, dims):
         assert s.dtype == np.float64 or s.dtype == np.float32
-        dim = np.int(np.prod(s.shape))
+        end = offset + dim
         if type(s) == specs.Array:
-            bound = np.inf * np.ones(dim, dtype=np.float32)
-            return -bound, bound
+            low[offset:end] = -np.inf
+            high[offset:end] = np.inf
         elif type(s) == specs.BoundedArray:
-            zeros = np.zeros(dim, dtype=np.float32)
-            return s.minimum + zeros, s.maximum + zeros
-
-    mins, maxs = [], []
-    for s in spec:
-        mn, mx = extract_min_max(s)
-        mins.append(mn)
-        maxs.append(mx)
-    low = np.concatenate(mins, axis=0)
-    high = np.concatenate(maxs, axis=0)
-    assert low.shape == high.shape
+            low[offset:end] = np.ravel(s.minimum)
+            high[offset:end] = np.ravel(s.maximum)
+        else:
+            raise ValueError('unsupported spec type %s' % type(s).__name__)
+        offset = end
     return spaces.Box(low, high, dtype=np.float32)
 
 
-def _flatten_obs(obs):
-    obs_pieces = []
-    for v in obs.values():
-        flat = np.array([v]) if np.isscalar(v) else v.ravel()
-        obs_pieces.append(flat)
-    return np.concatenate(obs_pieces, axis=0)
-
-
 class DMCWrapper(core.Env):
     def __init__(
         self,
@@ -47,7 +40,9 @@ class DMCWrapper(core.Env):
         camera_id=0,
         frame_skip=1,
         environment_kwargs=None,
-        channels_first=True
+        channels_first=True,
+        validate_actions=False,
+        include_internal_state=True
     ):
         assert 'random' in task_kwargs, 'please specify a seed, for deterministic behaviour'
         self._from_pixels = from_pixels
@@ -56,6 +51,8 @@ class DMCWrapper(core.Env):
         self._camera_id = camera_id
         self._frame_skip = frame_skip
         self._channels_first = channels_first
+        self._validate_actions = validate_actions
+        self._include_internal_state = include_internal_state
 
         # create task
         self._env = suite.load(
@@ -65,6 +62,10 @@ class DMCWrapper(core.Env):
             visualize_reward=visualize_reward,
             environment_kwargs=environment_kwargs
         )
+        # hot attributes bound once so step/reset/render skip the dot chain
+        self._physics = self._env.physics
+        self._env_step = self._env.step
+        self._env_reset = self._env.reset
 
         # true and normalized action spaces
         self._true_action_space = _spec_to_box([self._env.action_spec()])
@@ -74,6 +75,16 @@ class DMCWrapper(core.Env):
             shape=self._true_action_space.shape,
             dtype=np.float32
         )
+        # affine map from the normalized [-1, 1] range to the true bounds
+        self._act_scale = (
+            (self._true_action_space.high - self._true_action_space.low) / 2.0
+        ).astype(np.float32)
+        self._act_bias = (
+            (self._true_action_space.high + self._true_action_space.low) / 2.0
+        ).astype(np.float32)
+        # float32 rounding of scale/bias can overshoot the bounds by an ulp
+        self._act_low = self._true_action_space.low.astype(np.float32)
+        self._act_high = self._true_action_space.high.astype(np.float32)
 
         # create observation space
         if from_pixels:
@@ -90,6 +101,16 @@ class DMCWrapper(core.Env):
                 self._env.observation_spec().values()
         )
         
+        # fixed layout of the flattened observation
+        self._obs_keys, self._obs_offsets, self._obs_is_scalar = [], [], []
+        self._obs_dim = 0
+        for k, spec in self._env.observation_spec().items():
+            self._obs_keys.append(k)
+            self._obs_offsets.append(self._obs_dim)
+            self._obs_is_scalar.append(spec.shape == ())
+            self._obs_dim += int(np.prod(spec.shape))
+        self._obs_offsets.append(self._obs_dim)
+
         self.current_state = None
 
         # set seed
@@ -98,7 +119,18 @@ class DMCWrapper(core.Env):
     def __getattr__(self, name):
         return getattr(self._env, name)
 
+    def _flatten_obs(self, obs):
+        flat = np.empty(self._obs_dim, dtype=np.float32)
+        for i, k in enumerate(self._obs_keys):
+            start = self._obs_offsets[i]
+            if self._obs_is_scalar[i]:
+                flat[start] = obs[k]
+            else:
+                flat[start:self._obs_offsets[i + 1]] = obs[k].ravel()
+        return flat
+
     def _get_obs(self, time_step):
+        self.current_state = self._flatten_obs(time_step.observation)
         if self._from_pixels:
             obs = self.render(
                 height=self._height,
@@ -108,16 +140,13 @@ class DMCWrapper(core.Env):
             if self._channels_first:
                 obs = obs.transpose(2, 0, 1).copy()
         else:
-            obs = _flatten_obs(time_step.observation)
+            obs = self.current_state.copy()
         return obs
 
     def _convert_action(self, action):
-        action = action.astype(np.float64)
-        true_delta = self._true_action_space.high - self._true_action_space.low
-        norm_delta = self._norm_action_space.high - self._norm_action_space.low
-        action = (action - self._norm_action_space.low) / norm_delta
-        action = action * true_delta + self._true_action_space.low
-        action = action.astype(np.float32)
+        action = np.multiply(action, self._act_scale, dtype=np.float32)
+        action += self._act_bias
+        np.clip(action, self._act_low, self._act_high, out=action)
         return action
 
     @property
@@ -138,26 +167,29 @@ class DMCWrapper(core.Env):
         self._observation_space.seed(seed)
 
     def step(self, action):
-        assert self._norm_action_space.contains(action)
+        if __debug__ and self._validate_actions:
+            assert self._norm_action_space.contains(action)
         action = self._convert_action(action)
-        assert self._true_action_space.contains(action)
+        if __debug__ and self._validate_actions:
+            assert self._true_action_space.contains(action)
         reward = 0
-        extra = {'internal_state': self._env.physics.get_state().copy()}
+        extra = {}
+        if self._include_internal_state:
+            extra['internal_state'] = self._physics.get_state()
 
+        env_step = self._env_step
         for _ in range(self._frame_skip):
-            time_step = self._env.step(action)
+            time_step = env_step(action)
             reward += time_step.reward or 0
             done = time_step.last()
             if done:
                 break
         obs = self._get_obs(time_step)
-        self.current_state = _flatten_obs(time_step.observation)
         extra['discount'] = time_step.discount
         return obs, reward, done, extra
 
     def reset(self):
-        time_step = self._env.reset()
-        self.current_state = _flatten_obs(time_step.observation)
+        time_step = self._env_reset()
         obs = self._get_obs(time_step)
         return obs
 
@@ -166,6 +198,6 @@ class DMCWrapper(core.Env):
         height = height or self._height
         width = width or self._width
         camera_id = camera_id or self._camera_id
-        return self._env.physics.render(
+        return self._physics.render(
             height=height, width=width, camera_id=camera_id
         )